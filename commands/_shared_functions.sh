@@ -24,10 +24,74 @@ readonly MAGENTA='\033[0;35m'
 readonly BOLD='\033[1m'
 readonly RESET='\033[0m' # Reset formatting
 
+# CSV value type patterns, defined once and shared by the SQL and GraphQL converters
+readonly CSV_INTEGER_PATTERN='^[0-9]+$'
+readonly CSV_FLOAT_PATTERN='^[0-9]+\.[0-9]+$'
+readonly CSV_BOOLEAN_PATTERN='^(true|false)$'
+
+# awk functions shared by the SQL and GraphQL converters, so their CSV parsing matches
+# COPY ... (FORMAT csv): commas inside double quotes do not split, a doubled quote inside
+# quotes is a literal quote, and a quote anywhere in a field toggles quoting. csv_split
+# fills fields[i] and sets quoted[i] when any part of field i was quoted (a quoted empty
+# field is an empty string, not NULL). csv_quotes_open is true while a record ends inside
+# a quoted field, i.e. continues on the next line
+readonly CSV_AWK_FUNCTIONS='
+    function csv_quotes_open(record,    tmp) {
+        tmp = record
+        return gsub(/"/, "", tmp) % 2
+    }
+
+    function csv_split(record, fields, quoted,    n, i, c, len, in_quotes) {
+        split("", fields)
+        split("", quoted)
+        if (index(record, "\"") == 0) {
+            return split(record, fields, ",")
+        }
+
+        n = 1
+        fields[1] = ""
+        in_quotes = 0
+        len = length(record)
+        for (i = 1; i <= len; i++) {
+            c = substr(record, i, 1)
+            if (c == "\"") {
+                if (in_quotes && substr(record, i + 1, 1) == "\"") {
+                    fields[n] = fields[n] c
+                    i++
+                } else {
+                    in_quotes = !in_quotes
+                    quoted[n] = 1
+                }
+            } else if (c == "," && !in_quotes) {
+                fields[++n] = ""
+            } else {
+                fields[n] = fields[n] c
+            }
+        }
+        return n
+    }
+'
+
+# SQLSTATE of \copy errors caused by the CSV layout itself (bad_copy_file_format: short/long
+# rows, blank lines, bad quoting, stray CR/LF); only these are retried through the more
+# lenient INSERT conversion
+readonly COPY_FORMAT_ERROR_SQLSTATE='22P04'
+
+# A server message as psql prints it with VERBOSITY=verbose ("ERROR:  22P04: missing data
+# for column ..."). The SQLSTATE is matched instead of the text, which lc_messages translates
+readonly PSQL_VERBOSE_MESSAGE_PATTERN=':  ([0-9A-Z]{5}): '
+
 # Error tracking
 COMMAND_ERRORS=0
 COMMAND_WARNINGS=0
 
+# Rows per multi-row INSERT statement when converting CSV to SQL
+SQL_INSERT_BATCH_SIZE="${SQL_INSERT_BATCH_SIZE:-1000}"
+
+# Record count of the most recently loaded CSV file, so callers can tally
+# totals without re-reading the file
+LAST_LOADED_RECORD_COUNT=0
+
 # Timer for performance tracking
 START_TIME=""
 
@@ -96,6 +160,7 @@ LOG_DIR=""
 LOG_FILE=""
 LOG_ENABLED=true
 OPERATION_SUMMARY=""
+OPERATION_SUMMARY_TMP=""
 
 initialize_logging() {
     local tier="$1"
@@ -129,6 +194,10 @@ initialize_logging() {
     OPERATION_SUMMARY="$LOG_DIR/${tier}_${environment}_${operation}_${timestamp}_summary.json"
     echo '{"operations": [], "tables": {}, "errors": [], "warnings": []}' > "$OPERATION_SUMMARY"
 
+    # Scratch file reused for every summary update; it sits beside the summary so the
+    # mv that replaces the summary is a same-filesystem rename, not a copy
+    OPERATION_SUMMARY_TMP="${OPERATION_SUMMARY}.tmp"
+
     log_info "Logging initialized: $LOG_FILE"
 }
 
@@ -187,15 +256,15 @@ log_table_operation() {
 
     # Log to file
     if [[ -n "$LOG_FILE" ]]; then
-        echo "[$(date '+%Y-%m-%d %H:%M:%S')] [TABLE] $table_name: $operation $record_count records - $status" >> "$LOG_FILE"
+        local timestamp=$(date '+%Y-%m-%d %H:%M:%S')
+        echo "[$timestamp] [TABLE] $table_name: $operation $record_count records - $status" >> "$LOG_FILE"
         if [[ -n "$error_msg" ]]; then
-            echo "[$(date '+%Y-%m-%d %H:%M:%S')] [TABLE_ERROR] $table_name: $error_msg" >> "$LOG_FILE"
+            echo "[$timestamp] [TABLE_ERROR] $table_name: $error_msg" >> "$LOG_FILE"
         fi
     fi
 
     # Update JSON summary
     if [[ -n "$OPERATION_SUMMARY" ]] && [[ -f "$OPERATION_SUMMARY" ]]; then
-        local temp_json=$(mktemp)
         jq --arg table "$table_name" \
            --arg op "$operation" \
            --arg count "$record_count" \
@@ -207,8 +276,8 @@ log_table_operation() {
                "status": $status,
                "error": $error,
                "timestamp": now | todate
-           }' "$OPERATION_SUMMARY" > "$temp_json"
-        mv "$temp_json" "$OPERATION_SUMMARY"
+           }' "$OPERATION_SUMMARY" > "$OPERATION_SUMMARY_TMP"
+        mv "$OPERATION_SUMMARY_TMP" "$OPERATION_SUMMARY"
     fi
 }
 
@@ -250,9 +319,8 @@ log_warning() {
 
     # Add to JSON summary
     if [[ -n "$OPERATION_SUMMARY" ]] && [[ -f "$OPERATION_SUMMARY" ]]; then
-        local temp_json=$(mktemp)
-        jq --arg warning "$1" '.warnings += [$warning]' "$OPERATION_SUMMARY" > "$temp_json"
-        mv "$temp_json" "$OPERATION_SUMMARY"
+        jq --arg warning "$1" '.warnings += [$warning]' "$OPERATION_SUMMARY" > "$OPERATION_SUMMARY_TMP"
+        mv "$OPERATION_SUMMARY_TMP" "$OPERATION_SUMMARY"
     fi
 }
 
@@ -262,9 +330,8 @@ log_error() {
 
     # Add to JSON summary
     if [[ -n "$OPERATION_SUMMARY" ]] && [[ -f "$OPERATION_SUMMARY" ]]; then
-        local temp_json=$(mktemp)
-        jq --arg error "$1" '.errors += [$error]' "$OPERATION_SUMMARY" > "$temp_json"
-        mv "$temp_json" "$OPERATION_SUMMARY"
+        jq --arg error "$1" '.errors += [$error]' "$OPERATION_SUMMARY" > "$OPERATION_SUMMARY_TMP"
+        mv "$OPERATION_SUMMARY_TMP" "$OPERATION_SUMMARY"
     fi
 }
 
@@ -427,24 +494,55 @@ test_postgres_connection() {
 get_all_user_tables() {
     local database_url="$1"
 
-    # Get all user tables (excluding system schemas)
-    psql "$database_url" -t -c "
+    # Get all user tables (excluding system schemas). Unaligned (-A) output has no
+    # padding, so rows need no whitespace trimming afterwards
+    psql "$database_url" -t -A -c "
         SELECT table_name
         FROM information_schema.tables
         WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'hdb_catalog', 'hdb_views')
         AND table_type = 'BASE TABLE'
         ORDER BY table_name;
-    " 2>/dev/null | xargs -n1 | grep -v '^$'
+    " 2>/dev/null | grep -v '^$'
 }
 
 count_table_records_postgres() {
     local table_name="$1"
     local database_url="$2"
 
-    local count=$(psql "$database_url" -t -c "SELECT COUNT(*) FROM \"$table_name\";" 2>/dev/null | xargs)
+    local count=$(psql "$database_url" -t -A -c "SELECT COUNT(*) FROM \"$table_name\";" 2>/dev/null)
     echo "${count:-0}"
 }
 
+count_all_tables_records_postgres() {
+    local database_url="$1"
+
+    # Count every user table in one query and one connection, emitting "table|count"
+    # lines ordered like get_all_user_tables. query_to_xml runs each COUNT(*) on the
+    # server, and format('%I') quotes the schema and table names there
+    local counts
+    if counts=$(psql "$database_url" -t -A -F '|' -c "
+        SELECT table_name,
+               (xpath('/row/c/text()', query_to_xml(
+                   format('SELECT COUNT(*) AS c FROM %I.%I', table_schema, table_name),
+                   false, true, '')))[1]::text
+        FROM information_schema.tables
+        WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'hdb_catalog', 'hdb_views')
+        AND table_type = 'BASE TABLE'
+        ORDER BY table_name;
+    " 2>/dev/null); then
+        grep -v '^$' <<< "$counts"
+        return 0
+    fi
+
+    # One unreadable table (no SELECT privilege, lock timeout, broken foreign table) fails
+    # the whole query, so count table by table and let only the failing table report 0
+    log_warning "Counting all tables in one query failed, counting each table separately"
+    local table
+    while IFS= read -r table; do
+        echo "$table|$(count_table_records_postgres "$table" "$database_url")"
+    done < <(get_all_user_tables "$database_url")
+}
+
 purge_table_postgres() {
     local table_name="$1"
     local database_url="$2"
@@ -483,12 +581,9 @@ purge_all_tables_postgres() {
     log_info "Found $table_count tables to purge"
 
     # Count total records before purging
-    while IFS= read -r table; do
-        if [[ -n "$table" ]]; then
-            local count=$(count_table_records_postgres "$table" "$database_url")
-            ((total_records_purged += count))
-        fi
-    done <<< "$tables"
+    while IFS='|' read -r table count; do
+        ((total_records_purged += count))
+    done < <(count_all_tables_records_postgres "$database_url")
 
     log_info "Total records to purge: $total_records_purged"
 
@@ -532,56 +627,94 @@ csv_to_sql_insert() {
     # Create column list for INSERT
     local column_list=$(IFS=','; echo "${columns[*]}")
 
-    # Read CSV data (skip header) and convert to SQL INSERT statements
-    local sql_file=$(mktemp)
-
-    echo "BEGIN;" > "$sql_file"
-
-    tail -n +2 "$csv_file" | while IFS= read -r line; do
-        if [[ -z "$line" ]]; then
-            continue
-        fi
-
-        # Split line by comma and process each value
-        IFS=',' read -ra values <<< "$line"
-
-        # Build VALUES clause
-        local values_clause=""
-        local first_value=true
-
-        for i in "${!columns[@]}"; do
-            local value="${values[$i]:-}"
-
-            if [[ "$first_value" == "false" ]]; then
-                values_clause+=", "
-            fi
-
-            # Handle different data types
-            if [[ -z "$value" ]]; then
-                values_clause+="NULL"
-            elif [[ "$value" =~ ^[0-9]+$ ]]; then
-                # Integer
-                values_clause+="$value"
-            elif [[ "$value" =~ ^[0-9]+\.[0-9]+$ ]]; then
-                # Float
-                values_clause+="$value"
-            elif [[ "$value" =~ ^(true|false)$ ]]; then
-                # Boolean
-                values_clause+="$value"
-            else
-                # String - escape single quotes
-                local escaped_value=$(echo "$value" | sed "s/'/''/g")
-                values_clause+="'$escaped_value'"
-            fi
+    # Read CSV data (skip header) and write SQL INSERT statements to stdout, so the
+    # caller can stream them into psql while the rest of the file is still converting
+    echo "BEGIN;"
+
+    # Convert all rows in a single awk pass: field split, type detection, quoting
+    # and multi-row INSERT batching
+    INTEGER_RE="$CSV_INTEGER_PATTERN" FLOAT_RE="$CSV_FLOAT_PATTERN" BOOLEAN_RE="$CSV_BOOLEAN_PATTERN" \
+    INSERT_PREFIX="INSERT INTO \"$table_name\" ($column_list) VALUES" \
+    awk -v batch_size="$SQL_INSERT_BATCH_SIZE" -v column_count="${#columns[@]}" "$CSV_AWK_FUNCTIONS"'
+        BEGIN {
+            insert_prefix = ENVIRON["INSERT_PREFIX"]
+            integer_re = ENVIRON["INTEGER_RE"]
+            float_re = ENVIRON["FLOAT_RE"]
+            boolean_re = ENVIRON["BOOLEAN_RE"]
+            batch_separator = ""
+            batch_rows = 0
+        }
+
+        # Skip the header
+        NR == 1 { next }
+
+        {
+            # Join the lines of a record with a quoted newline, drop a CRLF ending,
+            # and skip blank lines
+            record = $0
+            while (csv_quotes_open(record) && (getline line) > 0) {
+                record = record "\n" line
+            }
+            sub(/\r$/, "", record)
+            if (record == "") {
+                next
+            }
+            csv_split(record, fields, quoted)
+
+            values_clause = ""
+            value_separator = ""
+            for (i = 1; i <= column_count; i++) {
+                value = fields[i]
+
+                # Handle different data types. Quoted fields are always strings, as COPY
+                # reads them; the server casts the literal to the column type
+                if (value == "" && !quoted[i]) {
+                    value = "NULL"
+                } else if (quoted[i] || (value !~ integer_re && value !~ float_re && value !~ boolean_re)) {
+                    # String - escape single quotes
+                    gsub(/\047/, "\047\047", value)
+                    value = "\047" value "\047"
+                }
+
+                values_clause = values_clause value_separator value
+                value_separator = ", "
+            }
+
+            # Accumulate rows into one multi-row INSERT, flushed every batch_size rows
+            batch_values = batch_values batch_separator "(" values_clause ")"
+            batch_separator = ",\n"
+            if (++batch_rows >= batch_size) {
+                print insert_prefix
+                print batch_values ";"
+                batch_values = ""
+                batch_separator = ""
+                batch_rows = 0
+            }
+        }
+
+        END {
+            if (batch_rows > 0) {
+                print insert_prefix
+                print batch_values ";"
+            }
+        }
+    ' "$csv_file"
+
+    echo "COMMIT;"
+}
 
-            first_value=false
-        done
+copy_csv_to_postgres() {
+    local csv_file="$1"
+    local table_name="$2"
+    local database_url="$3"
 
-        echo "INSERT INTO \"$table_name\" ($column_list) VALUES ($values_clause);" >> "$sql_file"
-    done
+    # Stream the whole file into the table with a single client-side \copy.
+    # psql's error output, with SQLSTATEs, is echoed so the caller can report or classify the failure
+    local column_list=$(head -n 1 "$csv_file")
+    local escaped_path="${csv_file//\'/\'\'}"
 
-    echo "COMMIT;" >> "$sql_file"
-    echo "$sql_file"
+    psql "$database_url" -v ON_ERROR_STOP=1 -v VERBOSITY=verbose \
+        -c "\\copy \"$table_name\" ($column_list) FROM '$escaped_path' WITH (FORMAT csv, HEADER true)" 2>&1 >/dev/null
 }
 
 load_csv_to_postgres() {
@@ -592,6 +725,7 @@ load_csv_to_postgres() {
     log_step "Loading CSV file: $(basename "$csv_file") -> $table_name"
 
     local record_count=$(get_csv_record_count "$csv_file")
+    LAST_LOADED_RECORD_COUNT=$record_count
     log_info "Found $record_count records to load"
 
     if [[ $record_count -eq 0 ]]; then
@@ -600,26 +734,50 @@ load_csv_to_postgres() {
         return 0
     fi
 
-    # Convert CSV to SQL
-    local sql_file=$(csv_to_sql_insert "$csv_file" "$table_name")
+    # Fast path: bulk load with \copy. COPY is a single statement, so a failure
+    # leaves the table untouched and the INSERT path below can retry cleanly
+    local copy_error
+    if copy_error=$(copy_csv_to_postgres "$csv_file" "$table_name" "$database_url"); then
+        log_success "Loaded $record_count records into $table_name"
+        log_table_operation "$table_name" "LOAD_POSTGRES" "$record_count" "success" ""
+        return 0
+    fi
 
-    if [[ ! -f "$sql_file" ]]; then
-        log_error "Failed to convert CSV to SQL for table $table_name"
-        log_table_operation "$table_name" "LOAD_POSTGRES" "$record_count" "error" "CSV to SQL conversion failed"
+    # Report the first error-class message (SQLSTATE classes 00-02 are notices and
+    # warnings), or psql's first line for client-side failures that carry no SQLSTATE
+    local copy_sqlstate="" line
+    while IFS= read -r line; do
+        if [[ "$line" =~ $PSQL_VERBOSE_MESSAGE_PATTERN ]] && [[ "${BASH_REMATCH[1]}" != 0[0-2]* ]]; then
+            copy_sqlstate="${BASH_REMATCH[1]}"
+            copy_error="$line"
+            break
+        fi
+    done <<< "$copy_error"
+    copy_error="${copy_error%%$'\n'*}"
+
+    # Data errors (constraint violations, bad values) would fail the INSERT path the same way
+    if [[ "$copy_sqlstate" != "$COPY_FORMAT_ERROR_SQLSTATE" ]]; then
+        copy_error="${copy_error:-COPY failed}"
+        log_error "Failed to load data into $table_name: $copy_error"
+        log_table_operation "$table_name" "LOAD_POSTGRES" "$record_count" "error" "$copy_error"
         return 1
     fi
 
-    # Execute SQL
-    if psql "$database_url" -f "$sql_file" >/dev/null 2>&1; then
+    # The INSERT converter parses quoting the same way, but pads short rows with NULL and
+    # drops extra fields where COPY rejects them
+    log_warning "COPY could not parse $(basename "$csv_file") ($copy_error), falling back to INSERT statements (short rows padded with NULL, extra fields dropped)"
+
+    # Convert CSV to SQL and stream it into psql, capturing psql's errors
+    local error_msg
+    if error_msg=$(csv_to_sql_insert "$csv_file" "$table_name" | psql "$database_url" -v ON_ERROR_STOP=1 2>&1 >/dev/null); then
         log_success "Loaded $record_count records into $table_name"
         log_table_operation "$table_name" "LOAD_POSTGRES" "$record_count" "success" ""
-        rm -f "$sql_file"
         return 0
     else
-        local error_msg=$(psql "$database_url" -f "$sql_file" 2>&1 | head -n 1)
+        error_msg="${error_msg%%$'\n'*}"
+        error_msg="${error_msg:-CSV to SQL conversion failed}"
         log_error "Failed to load data into $table_name: $error_msg"
         log_table_operation "$table_name" "LOAD_POSTGRES" "$record_count" "error" "$error_msg"
-        rm -f "$sql_file"
         return 1
     fi
 }
@@ -667,9 +825,9 @@ validate_csv_file() {
         return 1
     fi
 
-    # Check if file has header
-    local header_count=$(head -n 1 "$csv_file" | tr ',' '\n' | wc -l)
-    if [[ $header_count -lt 1 ]]; then
+    # Check if file has header (an empty first line counts as zero columns)
+    local header_count=$(awk -F',' 'NR == 1 { print NF; exit }' "$csv_file")
+    if [[ ${header_count:-0} -lt 1 ]]; then
         log_error "CSV file appears to have no header: $csv_file"
         return 1
     fi
@@ -678,6 +836,24 @@ validate_csv_file() {
     return 0
 }
 
+get_table_name_from_csv() {
+    local csv_file="$1"
+
+    # Strip the directory, the .csv extension and any "NN_" / "N_" ordering prefix
+    local table_name="${csv_file##*/}"
+    table_name="${table_name%.csv}"
+
+    if [[ "$table_name" =~ ^[0-9][0-9]_ ]]; then
+        table_name="${table_name:3}"
+    fi
+
+    if [[ "$table_name" =~ ^[0-9]_ ]]; then
+        table_name="${table_name:2}"
+    fi
+
+    echo "$table_name"
+}
+
 get_csv_record_count() {
     local csv_file="$1"
 
@@ -686,8 +862,14 @@ get_csv_record_count() {
         return
     fi
 
-    # Count lines excluding header
-    local count=$(tail -n +2 "$csv_file" | wc -l | xargs)
+    # Count lines excluding header (an empty or header-only file counts as 0)
+    local line_count=$(wc -l < "$csv_file")
+    local count=$((line_count - 1))
+
+    if [[ $count -lt 0 ]]; then
+        count=0
+    fi
+
     echo "$count"
 }
 
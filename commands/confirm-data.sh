@@ -152,10 +152,8 @@ confirm_via_postgres() {
     printf "%-35s %10s %10s\n" "Table Name" "Records" "Status"
     printf "%-35s %10s %10s\n" "----------" "-------" "------"
 
-    while IFS= read -r table; do
+    while IFS='|' read -r table count; do
         if [[ -n "$table" ]]; then
-            local count=$(count_table_records_postgres "$table" "$DATABASE_URL")
-
             if [[ "$count" -eq 0 ]]; then
                 printf "%-35s %10s %10s\n" "$table" "$count" "EMPTY"
             else
@@ -164,7 +162,7 @@ confirm_via_postgres() {
                 ((total_records += count))
             fi
         fi
-    done <<< "$all_tables"
+    done < <(count_all_tables_records_postgres "$DATABASE_URL")
 
     echo ""
     log_info "PostgreSQL Summary:"
@@ -210,8 +208,7 @@ compare_with_source_data() {
     printf "%-35s %10s %10s %10s\n" "----------" "---" "--------" "-----"
 
     for csv_file in "${csv_files[@]}"; do
-        local filename=$(basename "$csv_file" .csv)
-        local table_name=$(echo "$filename" | sed 's/^[0-9][0-9]_//' | sed 's/^[0-9]_//')
+        local table_name=$(get_table_name_from_csv "$csv_file")
 
         local csv_record_count=$(get_csv_record_count "$csv_file")
         ((total_csv_records += csv_record_count))
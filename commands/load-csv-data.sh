@@ -68,10 +68,67 @@ csv_to_graphql_mutation() {
     local header=$(head -n 1 "$csv_file")
     local columns=($(echo "$header" | tr ',' ' '))
 
-    # Read CSV data (skip header)
-    local data_lines=$(tail -n +2 "$csv_file")
-
-    if [[ -z "$data_lines" ]]; then
+    # Build the objects list in a single awk pass over the data rows (skipping the header)
+    local objects=$(
+        INTEGER_RE="$CSV_INTEGER_PATTERN" FLOAT_RE="$CSV_FLOAT_PATTERN" BOOLEAN_RE="$CSV_BOOLEAN_PATTERN" \
+        COLUMN_NAMES="${columns[*]}" \
+        awk -v column_count="${#columns[@]}" "$CSV_AWK_FUNCTIONS"'
+            BEGIN {
+                split(ENVIRON["COLUMN_NAMES"], column_names, " ")
+                integer_re = ENVIRON["INTEGER_RE"]
+                float_re = ENVIRON["FLOAT_RE"]
+                boolean_re = ENVIRON["BOOLEAN_RE"]
+                record_separator = ""
+            }
+
+            # Skip the header
+            NR == 1 { next }
+
+            {
+                # Join the lines of a record with a quoted newline, drop a CRLF ending,
+                # and skip blank lines
+                record = $0
+                while (csv_quotes_open(record) && (getline line) > 0) {
+                    record = record "\n" line
+                }
+                sub(/\r$/, "", record)
+                if (record == "") {
+                    next
+                }
+                csv_split(record, fields, quoted)
+
+                printf "%s\n      {", record_separator
+                record_separator = ","
+
+                field_separator = ""
+                for (i = 1; i <= column_count; i++) {
+                    value = fields[i]
+
+                    # Skip empty values (a quoted empty field is an empty string)
+                    if (value == "" && !quoted[i]) {
+                        continue
+                    }
+
+                    # Format value based on type (simple heuristic). Integers, floats and
+                    # booleans are bare; strings, dates and timestamps are quoted
+                    if (value == "" || (value !~ integer_re && value !~ float_re && value !~ boolean_re)) {
+                        gsub(/\\/, "&&", value)
+                        gsub(/"/, "\\\"", value)
+                        gsub(/\n/, "\\n", value)
+                        gsub(/\r/, "\\r", value)
+                        value = "\"" value "\""
+                    }
+
+                    printf "%s\n        %s: %s", field_separator, column_names[i], value
+                    field_separator = ","
+                }
+
+                printf "\n      }"
+            }
+        ' "$csv_file"
+    )
+
+    if [[ -z "$objects" ]]; then
         log_warning "No data found in CSV file: $csv_file"
         return 1
     fi
@@ -82,86 +139,29 @@ csv_to_graphql_mutation() {
         mutation_name="insert_${table_name}_on_conflict"
     fi
 
-    # Start building the mutation
-    local mutation="mutation {\n  $mutation_name(\n    objects: ["
-
-    # Process each data line
-    local first_record=true
-    while IFS= read -r line; do
-        if [[ -z "$line" ]]; then
-            continue
-        fi
-
-        if [[ "$first_record" == "false" ]]; then
-            mutation+=","
-        fi
-
-        mutation+="\n      {"
-
-        # Split line by comma and process each value
-        IFS=',' read -ra values <<< "$line"
-        local first_field=true
-
-        for i in "${!columns[@]}"; do
-            local column="${columns[$i]}"
-            local value="${values[$i]:-}"
-
-            # Skip empty values
-            if [[ -z "$value" ]]; then
-                continue
-            fi
-
-            if [[ "$first_field" == "false" ]]; then
-                mutation+=","
-            fi
-
-            # Format value based on type (simple heuristic)
-            if [[ "$value" =~ ^[0-9]+$ ]]; then
-                # Integer
-                mutation+="\n        $column: $value"
-            elif [[ "$value" =~ ^[0-9]+\.[0-9]+$ ]]; then
-                # Float
-                mutation+="\n        $column: $value"
-            elif [[ "$value" =~ ^(true|false)$ ]]; then
-                # Boolean
-                mutation+="\n        $column: $value"
-            elif [[ "$value" =~ ^[0-9]{4}-[0-9]{2}-[0-9]{2}$ ]] || [[ "$value" =~ ^[0-9]{4}-[0-9]{2}-[0-9]{2}[[:space:]][0-9]{2}:[0-9]{2}:[0-9]{2}$ ]]; then
-                # Date/timestamp
-                mutation+="\n        $column: \"$value\""
-            else
-                # String - escape quotes
-                local escaped_value=$(echo "$value" | sed 's/"/\\"/g')
-                mutation+="\n        $column: \"$escaped_value\""
-            fi
-
-            first_field=false
-        done
-
-        mutation+="\n      }"
-        first_record=false
-    done <<< "$data_lines"
-
-    mutation+="\n    ]"
+    local mutation_head="mutation {\n  $mutation_name(\n    objects: ["
+    local mutation_tail="\n    ]"
 
     # Add conflict resolution for upsert
     if [[ "$mutation_type" == "upsert" ]]; then
-        mutation+="\n    on_conflict: {\n      constraint: ${table_name}_pkey\n      update_columns: ["
+        mutation_tail+="\n    on_conflict: {\n      constraint: ${table_name}_pkey\n      update_columns: ["
         local first_col=true
         for column in "${columns[@]}"; do
             if [[ "$column" != "id" ]]; then
                 if [[ "$first_col" == "false" ]]; then
-                    mutation+=", "
+                    mutation_tail+=", "
                 fi
-                mutation+="$column"
+                mutation_tail+="$column"
                 first_col=false
             fi
         done
-        mutation+="]\n    }"
+        mutation_tail+="]\n    }"
     fi
 
-    mutation+="\n  ) {\n    affected_rows\n    returning {\n      id\n    }\n  }\n}"
+    mutation_tail+="\n  ) {\n    affected_rows\n    returning {\n      id\n    }\n  }\n}"
 
-    echo -e "$mutation"
+    # Only the fixed template goes through escape expansion; the objects are emitted as-is
+    printf '%b%s%b\n' "$mutation_head" "$objects" "$mutation_tail"
 }
 
 execute_graphql_mutation() {
@@ -169,23 +169,13 @@ execute_graphql_mutation() {
     local endpoint="$2"
     local admin_secret="$3"
 
-    # Create temporary file for mutation
-    local temp_file=$(mktemp)
-    echo "$mutation" > "$temp_file"
-
-    # Prepare GraphQL request
-    local graphql_query=$(jq -n --rawfile query "$temp_file" '{query: $query}')
-
-    # Execute mutation
-    local response=$(curl -s \
+    # Wrap the mutation as a compact JSON GraphQL request and send it to curl on stdin
+    local response=$(jq -c -R -s '{query: .}' <<< "$mutation" | curl -s \
         -H "x-hasura-admin-secret: $admin_secret" \
         -H "Content-Type: application/json" \
-        -d "$graphql_query" \
+        --data-binary @- \
         "$endpoint" 2>/dev/null)
 
-    # Clean up temp file
-    rm -f "$temp_file"
-
     # Check for errors
     if echo "$response" | jq -e '.errors' >/dev/null 2>&1; then
         log_error "GraphQL mutation failed:"
@@ -219,6 +209,7 @@ load_csv_file() {
     fi
 
     local record_count=$(get_csv_record_count "$csv_file")
+    LAST_LOADED_RECORD_COUNT=$record_count
     log_info "Found $record_count records to load"
 
     if [[ $record_count -eq 0 ]]; then
@@ -275,13 +266,11 @@ load_table_data() {
 
     for csv_file in "${csv_files[@]}"; do
         # Extract table name from filename
-        local filename=$(basename "$csv_file" .csv)
-        local table_name=$(echo "$filename" | sed 's/^[0-9][0-9]_//' | sed 's/^[0-9]_//')
+        local table_name=$(get_table_name_from_csv "$csv_file")
 
         if load_csv_file "$csv_file" "$table_name" "$endpoint" "$admin_secret" "$use_upsert"; then
             ((files_processed++))
-            local record_count=$(get_csv_record_count "$csv_file")
-            ((total_loaded += record_count))
+            ((total_loaded += LAST_LOADED_RECORD_COUNT))
         fi
     done
 
@@ -366,8 +355,7 @@ main() {
                     ((total_files++))
 
                     # Extract table name from filename
-                    local filename=$(basename "$csv_file" .csv)
-                    local table_name=$(echo "$filename" | sed 's/^[0-9][0-9]_//' | sed 's/^[0-9]_//')
+                    local table_name=$(get_table_name_from_csv "$csv_file")
 
                     if load_csv_file "$csv_file" "$table_name" "$GRAPHQL_ENDPOINT" "$GRAPHQL_ADMIN_SECRET" "false"; then
                         ((successful_files++))
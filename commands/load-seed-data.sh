@@ -39,7 +39,7 @@ show_help() {
 
     echo -e "${BOLD}UPLOAD MODES${RESET}"
     echo "    graphql           Upload via GraphQL API (uses Hasura mutations)"
-    echo "    postgres          Upload directly to PostgreSQL (uses SQL INSERT)"
+    echo "    postgres          Upload directly to PostgreSQL (uses \\copy, falls back to SQL INSERT)"
     echo ""
 
     echo -e "${BOLD}PIPELINE PHASES${RESET}"
@@ -214,15 +214,11 @@ load_all_data_postgres() {
                 ((total_files++))
 
                 # Extract table name from filename
-                local filename=$(basename "$csv_file" .csv)
-                local table_name=$(echo "$filename" | sed 's/^[0-9][0-9]_//' | sed 's/^[0-9]_//')
-
-                # Get record count for tracking
-                local record_count=$(get_csv_record_count "$csv_file")
+                local table_name=$(get_table_name_from_csv "$csv_file")
 
                 if load_csv_to_postgres "$csv_file" "$table_name" "$DATABASE_URL"; then
                     ((successful_files++))
-                    ((total_records_loaded += record_count))
+                    ((total_records_loaded += LAST_LOADED_RECORD_COUNT))
                 fi
             done
         fi
@@ -349,9 +345,8 @@ verify_data_postgres() {
     printf "%-30s %10s\n" "Table Name" "Records"
     printf "%-30s %10s\n" "----------" "-------"
 
-    while IFS= read -r table; do
+    while IFS='|' read -r table count; do
         if [[ -n "$table" ]]; then
-            local count=$(count_table_records_postgres "$table" "$DATABASE_URL")
             printf "%-30s %10s\n" "$table" "$count"
 
             if [[ $count -gt 0 ]]; then
@@ -359,7 +354,7 @@ verify_data_postgres() {
                 ((total_records += count))
             fi
         fi
-    done <<< "$tables"
+    done < <(count_all_tables_records_postgres "$DATABASE_URL")
 
     echo ""
     log_info "Verification summary:"
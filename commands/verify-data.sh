@@ -292,8 +292,7 @@ compare_with_source_data() {
     local matched_tables=0
 
     for csv_file in "${csv_files[@]}"; do
-        local filename=$(basename "$csv_file" .csv)
-        local table_name=$(echo "$filename" | sed 's/^[0-9][0-9]_//' | sed 's/^[0-9]_//')
+        local table_name=$(get_table_name_from_csv "$csv_file")
 
         local csv_record_count=$(get_csv_record_count "$csv_file")
         local db_record_count=$(count_table_records "$table_name" "$endpoint" "$admin_secret")